@@ -1,29 +1,60 @@
 #!/usr/bin/env python3
-from mcp.server.fastmcp import FastMCP
-from tools import SummarizationAgent, SentimentAgent, TranslationAgent
+import contextlib
+import os
+import uvicorn
+from mcp.server.fastmcp import Context, FastMCP
+from tools import SUMMARIZER, SENTIMENT, TRANSLATOR, close_bedrock_client, get_bedrock_client
 
 mcp = FastMCP("bedrock-tools",stateless_http=True)
 
-# Initialize tool instances
-summarization_agent = SummarizationAgent()
-sentiment_agent = SentimentAgent()
-translation_agent = TranslationAgent()
+async def _stream_to_client(agent, text: str, ctx: Context) -> str:
+    """Forward each generated chunk as a progress notification, then return the full text."""
+    chunks = []
+    async for chunk in agent.stream(text):
+        chunks.append(chunk)
+        await ctx.report_progress(progress=len(chunks), message=chunk)
+    return "".join(chunks)
 
 @mcp.tool()
-def summarize_text(text: str) -> str:
+async def summarize_text(text: str, ctx: Context) -> str:
     """Create a concise summary of a long piece of text"""
-    return summarization_agent.execute(text)
+    return await _stream_to_client(SUMMARIZER, text, ctx)
 
 @mcp.tool()
-def analyze_sentiment(text: str) -> str:
+async def analyze_sentiment(text: str, ctx: Context) -> str:
     """Determine the sentiment (POSITIVE, NEGATIVE, or NEUTRAL) of text"""
-    return sentiment_agent.execute(text)
+    return await _stream_to_client(SENTIMENT, text, ctx)
 
 @mcp.tool()
-def translate_to_french(text: str) -> str:
+async def translate_to_french(text: str, ctx: Context) -> str:
     """Translate English text into French"""
-    return translation_agent.execute(text)
+    return await _stream_to_client(TRANSLATOR, text, ctx)
+
+# ASGI app for the streamable-http transport; uvicorn workers import it by name.
+app = mcp.streamable_http_app()
+_mcp_lifespan = app.router.lifespan_context
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Run FastMCP's own lifespan and hold the shared Bedrock client open for the worker's lifetime."""
+    async with _mcp_lifespan(app):
+        await get_bedrock_client()
+        try:
+            yield
+        finally:
+            await close_bedrock_client()
+
+app.router.lifespan_context = lifespan
 
 if __name__ == "__main__":
     
-    mcp.run(transport="streamable-http")
\ No newline at end of file
+    uvicorn.run(
+        "fastmcp_server:app",
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        workers=min(4, os.cpu_count() or 1),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
+
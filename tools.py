@@ -1,221 +1,557 @@
-import boto3
-import json
+import aioboto3
+import asyncio
+import contextlib
+import hashlib
+import orjson
 import os
+import re
+import time
+from collections import OrderedDict
+from aiobotocore.config import AioConfig
+from botocore.exceptions import ClientError
 from loguru import logger
+from prompt_toolkit import PromptSession
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 # --- Configuration ---
-BEDROCK_REGION = os.environ.get("AWS_REGION", "us-east-1")
-MODEL_ID = "anthropic.claude-3-5-sonnet-20240620-v1:0"
+# Latency-optimized inference is served from us-east-2, so default there to
+# avoid a cross-region hop.
+BEDROCK_REGION = os.environ.get("AWS_REGION", "us-east-2")
+HAIKU_MODEL_ID = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+# US cross-region inference profile, so Sonnet is reachable from us-east-2.
+SONNET_MODEL_ID = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
+MODEL_ID = os.environ.get("BEDROCK_MODEL_ID", SONNET_MODEL_ID)
+# Per-task models. Routing and the one-word sentiment label default to Haiku;
+# summaries, translations and the final answer use MODEL_ID (Sonnet).
+ROUTER_MODEL_ID = os.environ.get("BEDROCK_ROUTER_MODEL_ID", HAIKU_MODEL_ID)
+SENTIMENT_MODEL_ID = os.environ.get("BEDROCK_SENTIMENT_MODEL_ID", HAIKU_MODEL_ID)
+SUMMARY_MODEL_ID = os.environ.get("BEDROCK_SUMMARY_MODEL_ID", MODEL_ID)
+TRANSLATION_MODEL_ID = os.environ.get("BEDROCK_TRANSLATION_MODEL_ID", MODEL_ID)
+ANSWER_MODEL_ID = os.environ.get("BEDROCK_ANSWER_MODEL_ID", MODEL_ID)
+# Models that support performanceConfig latency=optimized; anything else is
+# invoked with the standard profile so overriding MODEL_ID keeps working.
+LATENCY_OPTIMIZED_MODELS = {
+    "anthropic.claude-3-5-haiku-20241022-v1:0",
+    HAIKU_MODEL_ID,
+}
+# Output-token budget for the router beyond the echoed tool input.
+ROUTER_MAX_TOKENS = 128
+# Bedrock error codes worth retrying on top of the SDK's adaptive retries.
+RETRYABLE_ERROR_CODES = {"ThrottlingException", "ServiceUnavailableException", "ModelTimeoutException"}
+# Short texts with a clear VADER compound score skip Bedrock entirely.
+SENTIMENT_FAST_PATH_MAX_CHARS = 1000
+SENTIMENT_POLAR_THRESHOLD = 0.5
+SENTIMENT_NEUTRAL_THRESHOLD = 0.05
+# Seconds between 1-token requests that keep the REPL's Bedrock connection warm.
+KEEPALIVE_INTERVAL = 30
+RESPONSE_CACHE_SIZE = 4096
+# Translation runs at temperature 0.3, so its cached answers are only reused briefly.
+TRANSLATION_CACHE_TTL = 600
+# One pooled, keep-alive client is shared by every agent so bursts of MCP
+# requests reuse warm TLS connections instead of re-handshaking per call.
+BEDROCK_CLIENT_CONFIG = AioConfig(
+    region_name=BEDROCK_REGION,
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'max_attempts': 6, 'mode': 'adaptive'},
+    connect_timeout=3,
+    read_timeout=60
+)
 # --- Bedrock Client Initialization ---
-try:
-    bedrock_runtime = boto3.client(
-        service_name='bedrock-runtime',
-        region_name=BEDROCK_REGION
+# aioboto3 clients are async context managers, so the client is entered inside
+# the running event loop: the MCP server opens and closes it from its app
+# lifespan, and the REPL from main(). get_bedrock_client() also opens it on
+# first use for any other caller.
+_session = aioboto3.Session()
+_client_stack = contextlib.AsyncExitStack()
+_client_lock = asyncio.Lock()
+bedrock_runtime = None
+
+async def get_bedrock_client():
+    """Return the shared async bedrock-runtime client, creating it on first use."""
+    global bedrock_runtime
+    if bedrock_runtime is None:
+        async with _client_lock:
+            if bedrock_runtime is None:
+                bedrock_runtime = await _client_stack.enter_async_context(
+                    _session.client(
+                        service_name='bedrock-runtime',
+                        config=BEDROCK_CLIENT_CONFIG
+                    )
+                )
+    return bedrock_runtime
+
+async def close_bedrock_client():
+    """Close the shared bedrock-runtime client."""
+    global bedrock_runtime
+    await _client_stack.aclose()
+    bedrock_runtime = None
+
+def _is_retryable(error: BaseException) -> bool:
+    return isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES
+
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=wait_exponential_jitter(initial=0.5, max=8),
+    stop=stop_after_attempt(5),
+    reraise=True
+)
+async def call_bedrock(operation, **kwargs):
+    """Await a bedrock-runtime client call, retrying throttling and transient errors with backoff."""
+    return await operation(**kwargs)
+
+def latency_mode(model_id: str) -> str:
+    """Return the Bedrock performance latency setting for a model."""
+    return "optimized" if model_id in LATENCY_OPTIMIZED_MODELS else "standard"
+
+async def stream_model(client, body: bytes, model_id: str = MODEL_ID):
+    """Yield Claude's text deltas as Bedrock generates them."""
+    response = await call_bedrock(
+        client.invoke_model_with_response_stream,
+        body=body,
+        modelId=model_id,
+        performanceConfigLatency=latency_mode(model_id)
+    )
+    async for event in response['body']:
+        chunk = orjson.loads(event['chunk']['bytes'])
+        if chunk['type'] == 'content_block_delta' and chunk['delta']['type'] == 'text_delta':
+            yield chunk['delta']['text']
+
+# --- Response Cache ---
+class ResponseCache:
+    """In-process LRU of completed model responses with an optional per-entry TTL."""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str, ttl: float = None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+# Futures for requests currently streaming from Bedrock, keyed like response_cache.
+_inflight = {}
+
+async def stream_model_cached(body: bytes, model_id: str = MODEL_ID, ttl: float = None):
+    """Like stream_model, but answers repeated requests from response_cache.
+
+    The key is a blake2b digest of the model id and request body, so the
+    prompt text is not stored a second time. Identical requests arriving
+    while one is still streaming wait for its result (or its error)
+    instead of calling Bedrock again.
+    """
+    key = hashlib.blake2b(model_id.encode() + b"\0" + body, digest_size=16).hexdigest()
+    while True:
+        cached = response_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        pending = _inflight.get(key)
+        if pending is None:
+            break
+        # Shielded so a cancelled waiter does not cancel the shared future.
+        # A failed leader's exception is re-raised here rather than retried.
+        result = await asyncio.shield(pending)
+        if result is not None:
+            yield result
+            return
+        # The leading request was cancelled or abandoned; try again.
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    result = None
+    error = None
+    try:
+        chunks = []
+        async for chunk in stream_model(await get_bedrock_client(), body, model_id):
+            chunks.append(chunk)
+            yield chunk
+        result = "".join(chunks)
+        response_cache.put(key, result, ttl)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        del _inflight[key]
+        if error is not None:
+            future.set_exception(error)
+            # Mark it retrieved so it is not logged when nobody was waiting.
+            future.exception()
+        else:
+            # None when the leader was cancelled or closed early.
+            future.set_result(result)
+
+async def stream_converse(client, model_id: str = MODEL_ID, **kwargs):
+    """Yield text deltas from a streamed Converse API call."""
+    response = await call_bedrock(
+        client.converse_stream,
+        modelId=model_id,
+        performanceConfig={"latency": latency_mode(model_id)},
+        **kwargs
     )
-except Exception as e:
-    print(f"Error initializing Bedrock client: {e}")
-    exit()
+    async for event in response['stream']:
+        delta = event.get('contentBlockDelta', {}).get('delta', {})
+        if 'text' in delta:
+            yield delta['text']
+
+def extract_json_object(text: str):
+    """Parse the first balanced {...} object in text, ignoring surrounding prose.
+
+    Braces inside JSON strings are skipped. Returns None if no object parses.
+    """
+    depth = 0
+    start = None
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = depth > 0
+        elif char == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                try:
+                    return orjson.loads(text[start:i + 1])
+                except orjson.JSONDecodeError:
+                    start = None
+    return None
 
 # ==============================================================================
 # --- SPECIALIZED AGENT DEFINITIONS (OUR "TOOLS") ---
 # These classes are our well-defined, executable tools.
 # ==============================================================================
 
+# Static prompt fragments and request-body fields, built once at import time.
+_SUMMARY_PREFIX = "Human: Please provide a concise, high-level summary of the following text.\n\n<text>"
+_SUMMARY_SUFFIX = "</text>\n\nAssistant:"
+_SENTIMENT_PREFIX = "Human: Analyze the sentiment of the following text. Respond with only one word: POSITIVE, NEGATIVE, or NEUTRAL.\n\n<text>"
+_SENTIMENT_SUFFIX = "</text>\n\nAssistant:"
+_TRANSLATION_PREFIX = "Human: Translate the following English text into French. Provide only the French translation.\n\n<english_text>"
+_TRANSLATION_SUFFIX = "</english_text>\n\nAssistant:"
+
+_VADER = SentimentIntensityAnalyzer()
+
+_SUMMARY_BODY = {"anthropic_version": "bedrock-2023-05-31", "max_tokens": 512, "temperature": 0.0}
+_SENTIMENT_BODY = {"anthropic_version": "bedrock-2023-05-31", "max_tokens": 50, "temperature": 0.1}
+_TRANSLATION_BODY = {"anthropic_version": "bedrock-2023-05-31", "max_tokens": 2048, "temperature": 0.3}
+
 class SummarizationAgent:
     """Tool to summarize text."""
-    def execute(self, text: str) -> str:
-        print("...[Tool] SummarizationAgent Activated...")
-        prompt = f"Human: Please provide a concise, high-level summary of the following text.\n\n<text>{text}</text>\n\nAssistant:"
-        return self._invoke_model(prompt)
+    async def execute(self, text: str) -> str:
+        return "".join([chunk async for chunk in self.stream(text)])
 
-    def _invoke_model(self, prompt: str) -> str:
+    async def stream(self, text: str):
+        logger.debug("...[Tool] SummarizationAgent Activated...")
+        prompt = _SUMMARY_PREFIX + text + _SUMMARY_SUFFIX
+        async for chunk in self._stream_model(prompt):
+            yield chunk
+
+    async def _stream_model(self, prompt: str):
         try:
-            body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1024,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.0
-            })
-            response = bedrock_runtime.invoke_model(body=body, modelId=MODEL_ID)
-            response_body = json.loads(response.get('body').read())
-            return response_body['content'][0]['text']
+            body = orjson.dumps({**_SUMMARY_BODY, "messages": [{"role": "user", "content": prompt}]})
+            async for chunk in stream_model_cached(body, SUMMARY_MODEL_ID):
+                yield chunk
         except Exception as e:
-            return f"Error: {str(e)}"
+            yield f"Error: {str(e)}"
 
 class SentimentAgent:
     """Tool to analyze sentiment."""
-    def execute(self, text: str) -> str:
-        print("...[Tool] SentimentAgent Activated...")
-        prompt = f"Human: Analyze the sentiment of the following text. Respond with only one word: POSITIVE, NEGATIVE, or NEUTRAL.\n\n<text>{text}</text>\n\nAssistant:"
-        response_text = self._invoke_model(prompt).strip().upper()
+    async def execute(self, text: str) -> str:
+        logger.debug("...[Tool] SentimentAgent Activated...")
+        local_label = self._classify_locally(text)
+        if local_label is not None:
+            return local_label
+        prompt = _SENTIMENT_PREFIX + text + _SENTIMENT_SUFFIX
+        response_text = (await self._invoke_model(prompt, SENTIMENT_MODEL_ID)).strip().upper()
         return response_text if response_text in ["POSITIVE", "NEGATIVE", "NEUTRAL"] else "NEUTRAL"
 
-    def _invoke_model(self, prompt: str) -> str:
+    async def stream(self, text: str):
+        # The label is only valid once complete, so it is emitted as one chunk.
+        yield await self.execute(text)
+
+    def _classify_locally(self, text: str):
+        """Return a label from VADER when it is confident, else None to defer to Bedrock."""
+        if len(text) > SENTIMENT_FAST_PATH_MAX_CHARS:
+            return None
+        score = _VADER.polarity_scores(text)['compound']
+        if score >= SENTIMENT_POLAR_THRESHOLD:
+            return "POSITIVE"
+        if score <= -SENTIMENT_POLAR_THRESHOLD:
+            return "NEGATIVE"
+        if abs(score) < SENTIMENT_NEUTRAL_THRESHOLD:
+            return "NEUTRAL"
+        return None
+
+    async def _invoke_model(self, prompt: str, model_id: str = MODEL_ID) -> str:
         try:
-            body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 50,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.1
-            })
-            response = bedrock_runtime.invoke_model(body=body, modelId=MODEL_ID)
-            response_body = json.loads(response.get('body').read())
-            return response_body['content'][0]['text']
+            body = orjson.dumps({**_SENTIMENT_BODY, "messages": [{"role": "user", "content": prompt}]})
+            return "".join([chunk async for chunk in stream_model_cached(body, model_id)])
         except Exception as e:
             return "NEUTRAL"
 
 class TranslationAgent:
     """Tool to translate text to French."""
-    def execute(self, text: str) -> str:
-        print("...[Tool] TranslationAgent Activated...")
-        prompt = f"Human: Translate the following English text into French. Provide only the French translation.\n\n<english_text>{text}</english_text>\n\nAssistant:"
-        return self._invoke_model(prompt)
+    async def execute(self, text: str) -> str:
+        return "".join([chunk async for chunk in self.stream(text)])
+
+    async def stream(self, text: str):
+        logger.debug("...[Tool] TranslationAgent Activated...")
+        prompt = _TRANSLATION_PREFIX + text + _TRANSLATION_SUFFIX
+        async for chunk in self._stream_model(prompt):
+            yield chunk
 
-    def _invoke_model(self, prompt: str) -> str:
+    async def _stream_model(self, prompt: str):
         try:
-            body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 2048,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.3
-            })
-            response = bedrock_runtime.invoke_model(body=body, modelId=MODEL_ID)
-            response_body = json.loads(response.get('body').read())
-            return response_body['content'][0]['text']
+            body = orjson.dumps({**_TRANSLATION_BODY, "messages": [{"role": "user", "content": prompt}]})
+            async for chunk in stream_model_cached(body, TRANSLATION_MODEL_ID, ttl=TRANSLATION_CACHE_TTL):
+                yield chunk
         except Exception as e:
-            return f"Translation error: {str(e)}"
+            yield f"Translation error: {str(e)}"
+
+# Shared tool instances, used by both the MCP server and the orchestrator so
+# they share one response cache path.
+SUMMARIZER = SummarizationAgent()
+SENTIMENT = SentimentAgent()
+TRANSLATOR = TranslationAgent()
 
 # ==============================================================================
 # --- THE INTELLIGENT ORCHESTRATOR AGENT ---
 # This agent uses an LLM to decide which tool to use.
 # ==============================================================================
 
+# A leading "<instruction>:" wrapper, e.g. "summarise this content:Bedrock is ...".
+_INSTRUCTION_WRAPPER = re.compile(r"^\s*([^:\n]{1,80}):\s*(\S.*)$", re.DOTALL)
+# Words in that instruction that identify the tool before the router answers.
+_TOOL_HINTS = {
+    "summarize_text": ("summar", "short version", "tl;dr"),
+    "analyze_sentiment": ("sentiment", "feel", "sound", "tone"),
+    "translate_to_french": ("french", "translat"),
+}
+
 class LLMOrchestratorAgent:
     def __init__(self, client):
         self.client = client
-        self.model_id = MODEL_ID
+        self.router_model_id = ROUTER_MODEL_ID
+        self.answer_model_id = ANSWER_MODEL_ID
         
-        # Instantiate and map the tools
+        # Map the shared tool instances
         self.tools = {
-            "summarize_text": SummarizationAgent(),
-            "analyze_sentiment": SentimentAgent(),
-            "translate_to_french": TranslationAgent()
+            "summarize_text": SUMMARIZER,
+            "analyze_sentiment": SENTIMENT,
+            "translate_to_french": TRANSLATOR
         }
         
-        # Create the tool definition string for the prompt
-        self.tool_definitions = """
-        <tools>
-        <tool>
-            <name>summarize_text</name>
-            <description>Use this tool to create a concise summary of a long piece of text. The input is the text to summarize.</description>
-            <input_schema>{"text": "string"}</input_schema>
-        </tool>
-        <tool>
-            <name>analyze_sentiment</name>
-            <description>Use this tool to determine the sentiment (POSITIVE, NEGATIVE, or NEUTRAL) of a piece of text. The input is the text to analyze.</description>
-            <input_schema>{"text": "string"}</input_schema>
-        </tool>
-        <tool>
-            <name>translate_to_french</name>
-            <description>Use this tool to translate English text into the French language. The input is the English text to translate.</description>
-            <input_schema>{"text": "string"}</input_schema>
-        </tool>
-        <tool>
-            <name>no_tool_found</name>
-            <description>Use this tool if none of the other tools are suitable for the user's request. The input should be a reason why no tool was chosen.</description>
-            <input_schema>{"reason": "string"}</input_schema>
-        </tool>
-        </tools>
-        """
-
-    def _get_tool_selection_prompt(self, user_request: str) -> str:
-        return f"""
-        Human: You are an intelligent router that selects the best tool to respond to a user's request.
-        Based on the user's request and the available tools, choose the most appropriate tool and provide the necessary input for it.
-        Respond ONLY with a single valid JSON object containing "tool_name" and "tool_input".
-
-        {self.tool_definitions}
-
-        <user_request>
-        {user_request}
-        </user_request>
-
-        Assistant:
-        """
-
-    def process_request(self, user_request: str) -> str:
-        print("🧠 Orchestrator is thinking...")
-        
-        # === STEP 1: CHOOSE THE TOOL ===
-        prompt = self._get_tool_selection_prompt(user_request)
-        logger.info(f"process request:{prompt}")
-        body = json.dumps({
+        # Native tool definitions for the Converse API. Descriptions are kept
+        # terse since they are billed as input tokens on every routing call;
+        # the guidance on how to use them lives in the system prompt.
+        # The verbatim-copy rule lets stream_request's speculative run on the
+        # unwrapped text match the router's tool input exactly.
+        self.tool_config = {"tools": [
+            self._tool_spec("summarize_text", "Summarize long text.", "text"),
+            self._tool_spec("analyze_sentiment", "Classify sentiment: POSITIVE/NEGATIVE/NEUTRAL.", "text"),
+            self._tool_spec("translate_to_french", "Translate English to French.", "text"),
+            self._tool_spec("no_tool_found", "No other tool applies.", "reason")
+        ]}
+        self.system_prompt = [{"text": (
+            "You are an intelligent assistant that selects the best tool to respond to a user's request. "
+            "Call exactly one tool. Pass the text to process as \"text\", copied verbatim and without the surrounding instructions; "
+            "if no tool fits, call no_tool_found with a short \"reason\". "
+            "Once you have the tool's result, present it to the user in a clear and friendly final answer."
+        )}]
+
+    @staticmethod
+    def _tool_spec(name: str, description: str, field: str) -> dict:
+        return {"toolSpec": {
+            "name": name,
+            "description": description,
+            "inputSchema": {"json": {
+                "type": "object",
+                "properties": {field: {"type": "string"}},
+                "required": [field]
+            }}
+        }}
+
+    async def _keepalive(self):
+        """Periodically issue a 1-token request so pooled TLS connections stay warm while idle."""
+        body = orjson.dumps({
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 512,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.0
+            "max_tokens": 1,
+            "messages": [{"role": "user", "content": "ping"}]
         })
+        while True:
+            await asyncio.sleep(KEEPALIVE_INTERVAL)
+            try:
+                response = await call_bedrock(
+                    self.client.invoke_model,
+                    body=body,
+                    modelId=self.router_model_id,
+                    performanceConfigLatency=latency_mode(self.router_model_id)
+                )
+                # Drain the tiny body so the connection returns to the pool; the reply is unused.
+                await response['body'].read()
+            except Exception as e:
+                logger.debug("Keep-alive request failed: {}", e)
+
+    async def process_request(self, user_request: str) -> str:
+        return "".join([chunk async for chunk in self.stream_request(user_request)])
+
+    async def stream_request(self, user_request: str):
+        print("🧠 Orchestrator is thinking...")
         
+        # === STEP 1: CHOOSE THE TOOL ===
+        # Claude selects the tool through native function calling; the same
+        # conversation is continued with the tool result in STEP 3.
+        logger.opt(lazy=True).debug("process request: {}", lambda: user_request)
+        messages = [{"role": "user", "content": [{"text": user_request}]}]
+        # The selected tool's input echoes the text to process, so the router's
+        # output budget is a small fixed overhead plus roughly the request length.
+        max_tokens = min(ROUTER_MAX_TOKENS + len(user_request) // 3, 4096)
+        selection = asyncio.create_task(self._select_tool(messages, max_tokens))
+        # When the request is an obvious "<instruction>: <text>" for one tool,
+        # start that tool on the unwrapped text while the selection is in flight.
+        speculation = self._guess_tool_call(user_request)
+        if speculation is not None:
+            name, text = speculation
+            speculation = (name, text, asyncio.create_task(self.tools[name].execute(text)))
         try:
-            response = self.client.invoke_model(body=body, modelId=self.model_id)
-            response_body = json.loads(response.get('body').read())
-            tool_selection_json_str = response_body['content'][0]['text']
-            tool_selection = json.loads(tool_selection_json_str)
-            
+            async for chunk in self._respond(messages, selection, speculation):
+                yield chunk
+        finally:
+            selection.cancel()
+            if speculation is not None:
+                speculation[2].cancel()
+
+    def _guess_tool_call(self, user_request: str):
+        """Return (tool_name, text) if the request's wrapper clearly names one tool, else None."""
+        match = _INSTRUCTION_WRAPPER.match(user_request)
+        if match is None:
+            return None
+        instruction = match.group(1).lower()
+        candidates = [name for name, hints in _TOOL_HINTS.items() if any(hint in instruction for hint in hints)]
+        if len(candidates) != 1:
+            return None
+        return candidates[0], match.group(2).strip()
+
+    async def _select_tool(self, messages: list, max_tokens: int) -> dict:
+        return await call_bedrock(
+            self.client.converse,
+            modelId=self.router_model_id,
+            system=self.system_prompt,
+            messages=messages,
+            toolConfig={**self.tool_config, "toolChoice": {"any": {}}},
+            inferenceConfig={"maxTokens": max_tokens, "temperature": 0.0},
+            performanceConfig={"latency": latency_mode(self.router_model_id)}
+        )
+
+    async def _respond(self, messages: list, selection, speculation):
+        response = await selection
+        output_message = response['output']['message']
+        tool_use = next((block['toolUse'] for block in output_message['content'] if 'toolUse' in block), None)
+        if response['stopReason'] == 'max_tokens':
+            # A truncated selection would run the tool on partial text.
+            print("❌ Tool selection was cut off by the router's token limit")
+            yield "I'm sorry, your request was too long for me to route. Could you please shorten it?"
+            return
+        if tool_use is not None:
+            tool_name = tool_use['name']
+            tool_input = tool_use.get('input', {})
+        else:
+            # toolChoice "any" makes Converse return a parsed toolUse block, so
+            # this only salvages the rare complete (end_turn) prose reply that
+            # carries the selection as inline JSON.
+            tool_selection = None
+            if response['stopReason'] == 'end_turn':
+                reply = "".join(block.get('text', '') for block in output_message['content'])
+                tool_selection = extract_json_object(reply)
+            if not isinstance(tool_selection, dict) or not isinstance(tool_selection.get("tool_input", {}), dict):
+                print(f"❌ No tool selected by the LLM (stopReason: {response['stopReason']})")
+                yield "I'm sorry, I had trouble understanding which tool to use. Could you please rephrase your request?"
+                return
             tool_name = tool_selection.get("tool_name")
             tool_input = tool_selection.get("tool_input", {})
-            
-            logger.info(f"✅ Tool selected: {tool_name}")
-            logger.info(f"   Input provided: {tool_input}")
-
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"❌ Error parsing LLM response for tool selection: {e}")
-            return "I'm sorry, I had trouble understanding which tool to use. Could you please rephrase your request?"
+        logger.info("✅ Tool selected: {}", tool_name)
+        logger.opt(lazy=True).debug("   Input provided: {}", lambda: tool_input)
+        text_input = tool_input.get("text")
+        # Reuse the head start only if the router picked the guessed tool and
+        # text; otherwise stop it now instead of letting it run to completion.
+        reuse_speculation = speculation is not None and speculation[:2] == (tool_name, (text_input or "").strip())
+        if speculation is not None and not reuse_speculation:
+            speculation[2].cancel()
 
         # === STEP 2: EXECUTE THE TOOL ===
         if tool_name in self.tools:
             tool = self.tools[tool_name]
-            logger.info(f"in STEP 2 Execute Tool:{tool}")
-            text_input = tool_input.get("text")
+            logger.opt(lazy=True).debug("in STEP 2 Execute Tool: {}", lambda: tool)
             if not text_input:
-                 return "I understood which tool to use, but I couldn't find the text to process in your request."
+                 yield "I understood which tool to use, but I couldn't find the text to process in your request."
+                 return
             
             print("🛠️ Executing tool...")
-            tool_result = tool.execute(text_input)
+            if reuse_speculation:
+                tool_result = await speculation[2]
+            else:
+                tool_result = await tool.execute(text_input)
             print("✔️ Tool execution complete.")
             
             # === STEP 3: GENERATE FINAL RESPONSE ===
-            # We ask the LLM to present the result in a friendly way.
-            final_prompt = f"""
-            Human: A user asked the following question: "{user_request}"
-            We used a tool and got this result: "{tool_result}"
-            Please present this result to the user in a clear and friendly final answer.
-
-            Assistant:
-            """
-            final_body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 2048,
-                "messages": [{"role": "user", "content": final_prompt}],
-                "temperature": 0.7
-            })
-            final_response = self.client.invoke_model(body=final_body, modelId=self.model_id)
-            final_response_body = json.loads(final_response.get('body').read())
-            final_answer = final_response_body['content'][0]['text']
-            return final_answer
+            # Hand the result back as a toolResult so the LLM can present it.
+            messages.append(output_message)
+            if tool_use is not None:
+                result_block = {"toolResult": {
+                    "toolUseId": tool_use['toolUseId'],
+                    "content": [{"text": tool_result}]
+                }}
+            else:
+                result_block = {"text": f"We used the {tool_name} tool and got this result: \"{tool_result}\""}
+            messages.append({"role": "user", "content": [result_block]})
+            async for chunk in stream_converse(
+                self.client,
+                self.answer_model_id,
+                system=self.system_prompt,
+                messages=messages,
+                toolConfig=self.tool_config,
+                inferenceConfig={"maxTokens": 512, "temperature": 0.2}
+            ):
+                yield chunk
 
         elif tool_name == "no_tool_found":
-            return "I'm sorry, I don't have a tool that can help with that. I can summarize, analyze sentiment, or translate text to French."
+            yield "I'm sorry, I don't have a tool that can help with that. I can summarize, analyze sentiment, or translate text to French."
         else:
-            return f"I'm sorry, I selected an invalid tool ('{tool_name}'). Please try rephrasing your request."
+            yield f"I'm sorry, I selected an invalid tool ('{tool_name}'). Please try rephrasing your request."
 
 
 # ==============================================================================
 # --- INTERACTIVE MAIN FUNCTION ---
 # ==============================================================================
 
-def main():
+async def main():
     print("🚀 Intelligent Agentic AI Application - Initializing...")
-    orchestrator = LLMOrchestratorAgent(bedrock_runtime)
+    orchestrator = LLMOrchestratorAgent(await get_bedrock_client())
+    session = PromptSession()
+    keepalive = asyncio.create_task(orchestrator._keepalive())
     
     print("\n" + "="*60)
     print("🤖 Welcome! I am an intelligent AI assistant.")
@@ -227,27 +563,44 @@ def main():
     print("\nType 'exit' or 'quit' to end the session.")
     print("="*60)
 
-    while True:
-        try:
-            user_input = input("\n▶️  You: ")
-            if user_input.lower() in ['exit', 'quit']:
-                print("👋 Goodbye!")
-                break
-            
-            if not user_input:
-                continue
-
-            response = orchestrator.process_request(user_input)
+    try:
+        while True:
+            try:
+                print()
+                user_input = await session.prompt_async("▶️  You: ")
+                if user_input.lower() in ['exit', 'quit']:
+                    print("👋 Goodbye!")
+                    break
+                
+                if not user_input:
+                    continue
 
-            print("\n" + "-"*60)
-            print(f"🤖 AI: {response}")
-            print("-"*60)
+                print("\n" + "-"*60)
+                # The orchestrator prints its status lines before the answer
+                # starts, so the prefix waits for the first chunk.
+                prefix = "🤖 AI: "
+                async for chunk in orchestrator.stream_request(user_input):
+                    print(prefix + chunk, end="", flush=True)
+                    prefix = ""
+                print("\n" + "-"*60)
 
-        except KeyboardInterrupt:
-            print("\n👋 Goodbye!")
-            break
-        except Exception as e:
-            print(f"\nAn unexpected error occurred: {e}")
+            except (KeyboardInterrupt, EOFError):
+                print("\n👋 Goodbye!")
+                break
+            except asyncio.CancelledError:
+                # Ctrl-C while a response is streaming cancels this task under
+                # asyncio.run; treat it like Ctrl-C at the prompt. Task.uncancel
+                # only exists on Python 3.11+.
+                uncancel = getattr(asyncio.current_task(), "uncancel", None)
+                if uncancel is not None:
+                    uncancel()
+                print("\n👋 Goodbye!")
+                break
+            except Exception as e:
+                print(f"\nAn unexpected error occurred: {e}")
+    finally:
+        keepalive.cancel()
+        await close_bedrock_client()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file